@@ -0,0 +1,67 @@
+"""
+Startup-time regression checks for the CLI.
+
+Build pipelines call `bit-share create` and `bit-share seed` many times, so these
+subcommands must not pay for modules only the daemon or `--version`/`--help` need.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Generous bound on interpreter start plus CLI import; a regression to eager imports
+# (psutil, package metadata, daemon) shows up in the module checks below first
+MAX_STARTUP_SECONDS = 1.0
+
+
+def _run(args: list[str], cwd: Path) -> tuple[set[str], float]:
+    """Run the CLI with -X importtime and return the imported module names and wall time."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "bit_share", *args],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    modules = {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+    return modules, elapsed
+
+
+def test_create_imports(tmp_path: Path):
+    source = tmp_path / "data"
+    source.mkdir()
+    (source / "file.txt").write_text("content")
+
+    modules, elapsed = _run(["create", "-s", str(source), "-o", str(tmp_path / "data.json")], tmp_path)
+
+    assert "bit_share.packager" in modules
+    for name in ("psutil", "importlib.metadata", "bit_share.daemon", "bit_share.api"):
+        assert name not in modules, f"'create' imported {name}"
+    assert elapsed < MAX_STARTUP_SECONDS
+
+
+def test_seed_imports(tmp_path: Path):
+    # Without a package file seed stops right after loading its modules
+    modules, elapsed = _run(["seed", str(tmp_path / "missing.json"), str(tmp_path)], tmp_path)
+
+    assert "bit_share.api" in modules
+    for name in ("psutil", "importlib.metadata", "bit_share.daemon"):
+        assert name not in modules, f"'seed' imported {name}"
+    assert elapsed < MAX_STARTUP_SECONDS
+
+
+def test_help_startup(tmp_path: Path):
+    modules, elapsed = _run(["create", "--help"], tmp_path)
+
+    for name in ("psutil", "importlib.metadata", "bit_share.daemon", "bit_share.api", "bit_share.packager"):
+        assert name not in modules, f"'create --help' imported {name}"
+    assert elapsed < MAX_STARTUP_SECONDS
@@ -1,6 +1,20 @@
-from importlib.metadata import metadata
+from functools import cache
+from typing import Any
 
 NAME = "bit-share"
-VERSION = metadata(NAME)["Version"]
-DESCRIPTION = metadata(NAME)["Summary"]
 
+
+@cache
+def _metadata() -> Any:
+    # Reading package metadata scans sys.path, so it is deferred until --version or --help needs it
+    from importlib.metadata import metadata
+
+    return metadata(NAME)
+
+
+def __getattr__(name: str) -> str:
+    if name == "VERSION":
+        return _metadata()["Version"]
+    if name == "DESCRIPTION":
+        return _metadata()["Summary"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
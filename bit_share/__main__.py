@@ -1,23 +1,55 @@
 import argparse
 from pathlib import Path
-from . import NAME, VERSION, DESCRIPTION
-from .constants import PACKAGE_EXT
-from .daemon import Daemon
-from .packager import Packager
-from .package import Package
-from .api import API
+from typing import Any, NoReturn
+from collections.abc import Sequence
+from . import NAME
+from .constants import PACKAGE_EXT, PIECE_STORE, PIECE_STORE_LIMIT
 
 import os
+import sys
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """Top-level parser that looks up the package description only when help is printed."""
+
+    def format_help(self) -> str:
+        if self.description is None:
+            from . import DESCRIPTION
+            self.description = DESCRIPTION
+        return super().format_help()
+
+
+class _VersionAction(argparse.Action):
+    """Like argparse's version action, but resolves the version only when requested."""
+
+    def __init__(self, option_strings: Sequence[str], dest: str = argparse.SUPPRESS, help: str | None = None):
+        super().__init__(option_strings=option_strings, dest=dest, default=argparse.SUPPRESS, nargs=0, help=help)
+
+    def __call__(self, parser: argparse.ArgumentParser, namespace: argparse.Namespace, values: Any, option_string: str | None = None) -> NoReturn:
+        from . import VERSION
+        parser.exit(message=f"{parser.prog} {VERSION}\n")
+
 
 def __process_args(parser: argparse.ArgumentParser, args: argparse.Namespace):
     if args.daemon and args.command is not None:
         parser.error("--daemon cannot be combined with subcommands")
     
+    if args.workers != 1 and not args.daemon:
+        parser.error("--workers can only be used with --daemon")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     if args.daemon:
-        daemon = Daemon()
-        daemon.start()
+        from .daemon import Daemon
+
+        try:
+            Daemon(workers=args.workers).start()
+        except RuntimeError as e:
+            sys.exit(f"Error: {e}")
 
     if args.command == "create":
+        from .packager import Packager
 
         source = args.source or os.getcwd()
 
@@ -37,6 +69,9 @@ def __process_args(parser: argparse.ArgumentParser, args: argparse.Namespace):
         print(f"Package was written to '{output}'")
 
     if args.command == "seed":
+        from .package import Package
+        from .api import API
+
         assert isinstance(args.package, Path), "package argument must be a Path object"
         assert isinstance(args.path, Path), "path argument must be a Path object"
 
@@ -47,14 +82,61 @@ def __process_args(parser: argparse.ArgumentParser, args: argparse.Namespace):
             return
 
         print(f"Seeding package '{package.name}' with {len(package.filelist)} files...")
-        API.seed(package, args.path)
+        API.seed(package, args.path.resolve())
+
+    if args.command == "fetch":
+        if args.store_limit < 0:
+            parser.error("--store-limit must not be negative")
+
+        from .package import Package
+        from .piecestore import PieceStore
+        from .fetcher import Fetcher
+
+        try: 
+            package = Package.from_file(args.package)
+        except FileNotFoundError:
+            print(f"Error: package file '{args.package}' not found")
+            return
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        files = package.select(args.include, args.exclude)
+        if not files:
+            print("Error: no files in the package match the given filters")
+            return
+
+        sources: list[tuple[Package, Path]] = []
+        for source_package, source_path in args.reuse:
+            try:
+                sources.append((Package.from_file(source_package), Path(source_path)))
+            except (FileNotFoundError, ValueError) as e:
+                print(f"Error: {e}")
+                return
+
+        store = PieceStore(args.store or PIECE_STORE, args.store_limit * 1024 * 1024)
+        try:
+            fetcher = Fetcher(package, args.path, args.peer, store, files, sources)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        missing = len(fetcher.missing())
+        print(f"Fetching {len(files)} of {len(package.filelist)} files from package '{package.name}': {len(fetcher.piece_indices) - missing} pieces available locally, {missing} to download...")
+        try:
+            fetcher.fetch()
+        except ConnectionError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Package was written to '{args.path}'")
 def main():
-    parser = argparse.ArgumentParser(prog=NAME, description=DESCRIPTION)
+    parser = _ArgumentParser(prog=NAME)
     
     parser.add_argument('-D', '--daemon', action='store_true', help=f"start {NAME} daemon")
-    parser.add_argument('-v', '--version', action='version', version=f"%(prog)s {VERSION}", help="show program's version number and exit")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="number of transfer server processes sharing the transfer port (default: 1)")
+    parser.add_argument('-v', '--version', action=_VersionAction, help="show program's version number and exit")
     
-    subparsers = parser.add_subparsers(dest='command', title="available commands") # type: ignore
+    subparsers = parser.add_subparsers(dest='command', title="available commands", parser_class=argparse.ArgumentParser) # type: ignore
 
     create_parser = subparsers.add_parser('create', help="create a bit-share package from a file or directory")
     create_parser.add_argument('-s', '--source', type=str, help="path to the source file or directory (defaults to current directory)")
@@ -64,6 +146,16 @@ def main():
     seed_parser = subparsers.add_parser('seed', help="seed a package to the network")
     seed_parser.add_argument('package', type=Path, help="path to the package file to seed")
     seed_parser.add_argument('path', type=Path, help="local path to seed for this package")
+
+    fetch_parser = subparsers.add_parser('fetch', help="fetch a package from peers, reusing locally stored pieces")
+    fetch_parser.add_argument('package', type=Path, help="path to the package file to fetch")
+    fetch_parser.add_argument('path', type=Path, help="local directory to write the package files into")
+    fetch_parser.add_argument('-p', '--peer', action='append', default=[], help="address of a peer seeding the package (repeatable)")
+    fetch_parser.add_argument('-i', '--include', action='append', default=[], help="gitignore-style glob of files or directories to fetch, relative to the package root: a pattern without '/' matches a name at any depth, '*' stays within a directory and '**' spans directories (repeatable, defaults to all files)")
+    fetch_parser.add_argument('-e', '--exclude', action='append', default=[], help="glob of files or directories to skip, with the same matching as --include (repeatable)")
+    fetch_parser.add_argument('-r', '--reuse', nargs=2, action='append', default=[], metavar=('PACKAGE', 'PATH'), help="reuse pieces from a local copy of another package, e.g. the previous version's output or a seeded directory (repeatable, PATH may be the fetch target)")
+    fetch_parser.add_argument('--store', type=Path, help="directory of the piece cache shared by all packages, which keeps downloaded pieces for later fetches (defaults to ~/.cache/bit-share/pieces)")
+    fetch_parser.add_argument('--store-limit', type=int, default=PIECE_STORE_LIMIT // (1024 * 1024), metavar='MB', help="size of the piece cache; least recently used pieces are pruned beyond it, 0 disables caching (default: %(default)s)")
     
     args = parser.parse_args()
 
@@ -1,5 +1,10 @@
+import os
+
 PIECE_SIZE = 1024 * 1024 * 1 # 1 MB
 PACKAGE_EXT = "json"
 REMOTE_DAEMON_PORT = 4643
 REMOTE_TRANSFER_PORT = 4644
-LOCAL_DAEMON_PORT = 4645
\ No newline at end of file
+LOCAL_DAEMON_PORT = 4645
+TRANSFER_TIMEOUT = 10 # seconds a TCP peer may stay silent before it is dropped
+PIECE_STORE = os.path.join(os.path.expanduser("~"), ".cache", "bit-share", "pieces")
+PIECE_STORE_LIMIT = 1024 * 1024 * 1024 * 4 # 4 GB, least recently used pieces are pruned beyond this
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
 import signal
 import socket
 import threading
+import time
 from abc import ABC, abstractmethod
+from multiprocessing.managers import SyncManager
+from multiprocessing.synchronize import Event as ProcessEvent
 from types import FrameType
 from typing import Callable
-import psutil
 
 from bit_share.api import API
 from bit_share.peerbox import PeerBox
 
 
-from .constants import LOCAL_DAEMON_PORT, REMOTE_DAEMON_PORT, REMOTE_TRANSFER_PORT
-from .transfer import next_packet
+from .constants import LOCAL_DAEMON_PORT, REMOTE_DAEMON_PORT, REMOTE_TRANSFER_PORT, TRANSFER_TIMEOUT
+from .transfer import next_packet, recv_packet, send_packet
 from .seedbox import SeedBox
 from .packets import Packet
 from .packets import *
@@ -21,6 +25,8 @@ from .packets import *
 
 def is_local_ip(ip: str) -> bool:
     """Check if the given IP is a local machine address."""
+    import psutil
+
     local_ips = {"127.0.0.1"}
 
     try:
@@ -34,11 +40,65 @@ def is_local_ip(ip: str) -> bool:
     return ip in local_ips
 
 
+# Workers are started from a thread while the other servers run, and forking a
+# multi-threaded process can deadlock, so helper processes are always spawned
+_PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _ignore_sigint() -> None:
+    """Leave SIGINT to the main daemon process, which stops helper processes itself."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _init_manager() -> None:
+    """Initializer of the seed manager process, which must not outlive the main daemon."""
+    _ignore_sigint()
+    parent = multiprocessing.parent_process()
+
+    def _watch_parent() -> None:
+        while parent is None or parent.is_alive():
+            time.sleep(0.5)
+        os._exit(0)
+
+    threading.Thread(target=_watch_parent, name="parent-watcher", daemon=True).start()
+
+
+def _transfer_worker(daemon_cls: type[DaemonBase], seed_box: SeedBox, stop: ProcessEvent) -> None:
+    """Entry point of a transfer worker process."""
+    _ignore_sigint()
+
+    daemon = daemon_cls()
+    daemon.seed_box = seed_box
+    daemon._reuse_port = True
+
+    parent = multiprocessing.parent_process()
+
+    def _watch_stop() -> None:
+        # Poll rather than block in stop.wait(): a worker killed while sleeping on the
+        # event would leave the main process hanging in stop.set() at shutdown.
+        # Also exit with the main daemon, so no orphan keeps the port with stale seeds.
+        while not stop.is_set() and (parent is None or parent.is_alive()):
+            time.sleep(0.5)
+        daemon.stop()
+
+    threading.Thread(target=_watch_stop, name="stop-watcher", daemon=True).start()
+    daemon._remote_transfer_server()
+
+
 class DaemonBase(ABC):
     """Base class providing generic server infrastructure."""
     
-    def __init__(self):
+    def __init__(self, workers: int = 1):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("transfer workers require SO_REUSEPORT, which this platform lacks")
+
+        self.workers = workers
         self._stop_event = threading.Event()
+        self._reuse_port = False
+        self._manager: SyncManager | None = None
+        self._failure: str | None = None
         self.seed_box = SeedBox()
         self.peer_box = PeerBox()
 
@@ -55,20 +115,31 @@ class DaemonBase(ABC):
         raise NotImplementedError
 
     def start(self) -> None:
+        """Run the servers until stopped by SIGINT, SIGTERM or stop(). Raises RuntimeError if a transfer worker died."""
         self._stop_event.clear()
+        self._failure = None
+
+        if self.workers > 1:
+            self._manager = SyncManager(ctx=_PROCESS_CONTEXT)
+            self._manager.start(_init_manager)
+            self.seed_box = SeedBox.shared(self._manager)
+            transfer_server = self._run_transfer_workers
+        else:
+            transfer_server = self._remote_transfer_server
 
         threads = [
             threading.Thread(target=self._remote_daemon_server, name="remote-daemon-server"),
-            threading.Thread(target=self._remote_transfer_server, name="remote-transfer-server"),
+            threading.Thread(target=transfer_server, name="remote-transfer-server"),
             threading.Thread(target=self._local_daemon_server, name="local-daemon-server"),
         ]
 
-        def _handle_sigint(_signum: int, _frame: FrameType | None) -> None:
+        def _handle_shutdown(_signum: int, _frame: FrameType | None) -> None:
             print("Server is shutting down...")
             self.stop()
 
-        previous_sigint_handler = signal.getsignal(signal.SIGINT)
-        signal.signal(signal.SIGINT, _handle_sigint)
+        previous_handlers = {
+            signum: signal.signal(signum, _handle_shutdown) for signum in (signal.SIGINT, signal.SIGTERM)
+        }
 
         try:
             for thread in threads:
@@ -83,12 +154,49 @@ class DaemonBase(ABC):
             self.stop()
             for thread in threads:
                 thread.join(timeout=1.0)
-            signal.signal(signal.SIGINT, previous_sigint_handler)
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        if self._failure is not None:
+            raise RuntimeError(self._failure)
 
     def stop(self) -> None:
         """Signal all servers to stop."""
         self._stop_event.set()
 
+    def _run_transfer_workers(self) -> None:
+        """Run the transfer server in worker processes sharing one port via SO_REUSEPORT."""
+        stop = _PROCESS_CONTEXT.Event()
+        processes = [
+            _PROCESS_CONTEXT.Process(
+                target=_transfer_worker,
+                args=(type(self), self.seed_box, stop),
+                name=f"remote-transfer-worker-{index}",
+            )
+            for index in range(self.workers)
+        ]
+
+        for process in processes:
+            process.start()
+
+        try:
+            while not self._stop_event.wait(timeout=0.5):
+                dead = [process for process in processes if not process.is_alive()]
+                for process in dead:
+                    print(f"[TRANSFER/ERR] worker={process.name} | exitcode={process.exitcode} | shutting down")
+                if dead:
+                    self._failure = f"transfer worker {dead[0].name} exited with code {dead[0].exitcode}"
+                    self.stop()
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
+
     def _close_socket(self, sock: socket.socket) -> None:
         """Safely close a socket, ignoring errors."""
         try:
@@ -113,15 +221,40 @@ class DaemonBase(ABC):
         finally:
             self._close_socket(sock)
 
+    def _serve_tcp_connection(
+        self,
+        conn: socket.socket,
+        addr: tuple[str, int],
+        handler: Callable[[Packet, tuple[str, int]], Packet | None]
+    ) -> None:
+        """Serve packets from one TCP connection until the peer closes it or stays silent for TRANSFER_TIMEOUT."""
+        conn.settimeout(TRANSFER_TIMEOUT)
+
+        try:
+            while not self._stop_event.is_set():
+                # Use addr from accept(), not from recv_packet (which returns None for TCP)
+                packet, _ = recv_packet(conn)
+                reply = handler(packet, addr)
+                if reply is not None:
+                    send_packet(conn, reply)
+        except (ConnectionError, OSError, ValueError):
+            # Includes socket.timeout, so idle or stalled peers are dropped
+            pass
+        finally:
+            self._close_socket(conn)
+
     def _run_tcp_server(
         self,
         host: str,
         port: int,
-        handler: Callable[[Packet, tuple[str, int]], None]
+        handler: Callable[[Packet, tuple[str, int]], Packet | None]
     ) -> None:
-        """Generic TCP server that accepts connections and receives packets."""
+        """Generic TCP server that serves each connection in its own thread. Packets returned by handler are sent back as replies."""
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self._reuse_port:
+            # Let the kernel spread connections across every worker bound to this port
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         sock.bind((host, port))
         sock.listen()
         sock.settimeout(0.5)
@@ -135,12 +268,12 @@ class DaemonBase(ABC):
                 except OSError:
                     break
 
-                try:
-                    # Use addr from accept(), not from next_packet (which returns None for TCP)
-                    for packet, _ in next_packet(conn, self._stop_event):
-                        handler(packet, addr)
-                finally:
-                    self._close_socket(conn)
+                threading.Thread(
+                    target=self._serve_tcp_connection,
+                    args=(conn, addr, handler),
+                    name=f"tcp-connection-{addr[0]}:{addr[1]}",
+                    daemon=True,
+                ).start()
         finally:
             self._close_socket(sock)
 
@@ -148,8 +281,8 @@ class DaemonBase(ABC):
 class Daemon(DaemonBase):
     """Application-specific daemon with three server endpoints."""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, workers: int = 1):
+        super().__init__(workers)
 
     def _remote_daemon_server(self) -> None:
         print(f"Remote daemon server (UDP) listening on 0.0.0.0:{REMOTE_DAEMON_PORT}")
@@ -183,8 +316,26 @@ class Daemon(DaemonBase):
     def _remote_transfer_server(self) -> None:
         print(f"Remote transfer server (TCP) listening on 0.0.0.0:{REMOTE_TRANSFER_PORT}")
         
-        def handler(packet: Packet, addr: tuple[str, int]) -> None:
+        def handler(packet: Packet, addr: tuple[str, int]) -> Packet | None:
+            if isinstance(packet, PieceRequestPacket):
+                found = self.seed_box.lookup_piece(packet.digest)
+
+                if not found:
+                    print(f"[TRANSFER/P-REQ] found=no | digest={packet.digest} | from={addr[0]}")
+                    return PieceResponsePacket.from_piece(None)
+
+                seed, index = found
+                try:
+                    piece = seed.package.read_piece(seed.path, index)
+                except OSError:
+                    print(f"[TRANSFER/P-REQ] found=unreadable | digest={packet.digest} | from={addr[0]}")
+                    return PieceResponsePacket.from_piece(None)
+
+                print(f"[TRANSFER/P-REQ] found=yes | digest={packet.digest} | from={addr[0]}")
+                return PieceResponsePacket.from_piece(piece)
+
             print(f"[remote-transfer/TCP] Received from {addr[0]}:{addr[1]} | type={packet.type.value} | size={len(packet.data)} bytes")
+            return None
 
         self._run_tcp_server("", REMOTE_TRANSFER_PORT, handler)
 
@@ -0,0 +1,176 @@
+from collections.abc import Iterable
+from pathlib import PurePosixPath
+import os
+import socket
+
+from .constants import REMOTE_TRANSFER_PORT, TRANSFER_TIMEOUT
+from .package import Package
+from .packets import PieceRequestPacket, PieceResponsePacket
+from .piecestore import PieceStore, digest
+from .transfer import recv_packet, send_packet
+
+
+class Fetcher:
+    """
+    Downloads a package into a local directory.
+    Each piece is taken from the first place that has it: the shared piece store, a
+    local copy of another package (sources, e.g. the previous version's output or a
+    seeded directory), or a peer. Only pieces found nowhere locally are requested from
+    peers. If files is given, only the pieces of those files are fetched.
+    """
+
+    def __init__(
+        self,
+        package: Package,
+        path: str | os.PathLike[str],
+        peers: Iterable[str],
+        store: PieceStore | None = None,
+        files: Iterable[str] | None = None,
+        sources: Iterable[tuple[Package, str | os.PathLike[str]]] = ()
+    ):
+        if package.piece_count() and not package.pieces:
+            raise ValueError("package has no piece digests; re-create it with this version of bit-share")
+        if len(package.pieces) != package.piece_count():
+            raise ValueError(f"package lists {len(package.pieces)} piece digests but has {package.piece_count()} pieces")
+
+        self.package = package
+        self.path = os.fspath(path)
+        self.peers = list(peers)
+        self.store = store if store is not None else PieceStore()
+        self.files = set(files) if files is not None else {path for path, _ in package.filelist}
+        self.piece_indices = package.pieces_for(self.files)
+
+        for file_path in self.files:
+            self._target(file_path)
+
+        # piece digest -> (package, root, piece index) of a local copy that holds it
+        self._local: dict[str, tuple[Package, str, int]] = {}
+        for source, root in sources:
+            for index, piece_digest in enumerate(source.pieces):
+                self._local.setdefault(piece_digest, (source, os.fspath(root), index))
+
+    def _target(self, file_path: str) -> str:
+        """Local path of a package file. Rejects paths that would escape the target directory."""
+        parts = PurePosixPath(file_path).parts
+        if not parts or PurePosixPath(file_path).is_absolute() or os.path.isabs(file_path) or ".." in parts:
+            raise ValueError(f"unsafe file path in package: '{file_path}'")
+
+        root = os.path.abspath(self.path)
+        target = os.path.abspath(os.path.join(root, *parts))
+        if os.path.commonpath([root, target]) != root:
+            raise ValueError(f"unsafe file path in package: '{file_path}'")
+
+        return target
+
+    def missing(self) -> list[str]:
+        """
+        Returns:
+            list: Digests of selected pieces that are neither in the store nor in a local source.
+        """
+
+        return [
+            piece_digest
+            for piece_digest in self.store.missing(self.package.pieces[index] for index in self.piece_indices)
+            if piece_digest not in self._local
+        ]
+
+    def _read_local(self, piece_digest: str) -> bytes | None:
+        """Read a piece from a local source, or None if no source still holds matching content."""
+        location = self._local.get(piece_digest)
+        if location is None:
+            return None
+
+        source, root, index = location
+        try:
+            piece = source.read_piece(root, index)
+        except OSError:
+            return None
+
+        return piece if digest(piece) == piece_digest else None
+
+    def _download_piece(self, piece_digest: str, connections: dict[str, socket.socket]) -> bytes:
+        """Try each peer in turn until one returns the piece with a matching digest, and cache it in the store."""
+        if not self.peers:
+            raise ConnectionError("no peers to fetch missing pieces from")
+
+        for peer in self.peers:
+            try:
+                sock = connections.get(peer)
+                if sock is None:
+                    sock = socket.create_connection((peer, REMOTE_TRANSFER_PORT), timeout=TRANSFER_TIMEOUT)
+                    connections[peer] = sock
+
+                send_packet(sock, PieceRequestPacket.from_digest(piece_digest))
+                packet, _ = recv_packet(sock)
+            except (ConnectionError, OSError):
+                # OSError includes socket.timeout, so an unresponsive peer falls through to the next one
+                dropped = connections.pop(peer, None)
+                if dropped is not None:
+                    dropped.close()
+                continue
+
+            if not isinstance(packet, PieceResponsePacket) or packet.piece is None:
+                continue
+
+            try:
+                self.store.put(packet.piece, piece_digest)
+            except ValueError:
+                continue
+            return packet.piece
+
+        raise ConnectionError(f"no peer could provide piece {piece_digest}")
+
+    def fetch(self) -> int:
+        """
+        Write the selected package files under path.
+        Files are written to '<file>.part' and renamed once every piece is in place,
+        so a source directory may also be the target of the fetch.
+        Returns:
+            int: Number of pieces downloaded from peers.
+        """
+
+        parts: dict[str, str] = {}
+        connections: dict[str, socket.socket] = {}
+        downloaded = 0
+        completed = False
+
+        try:
+            for file_path, size in self.package.filelist:
+                if file_path not in self.files:
+                    continue
+
+                part = f"{self._target(file_path)}.part"
+                os.makedirs(os.path.dirname(part), exist_ok=True)
+                with open(part, "wb") as file:
+                    file.truncate(size)
+                parts[file_path] = part
+
+            for index in self.piece_indices:
+                piece_digest = self.package.pieces[index]
+
+                piece = self.store.get(piece_digest)
+                if piece is None:
+                    piece = self._read_local(piece_digest)
+                if piece is None:
+                    piece = self._download_piece(piece_digest, connections)
+                    downloaded += 1
+
+                for file_path, offset, _ in self.package.piece_segments(index):
+                    with open(parts[file_path], "r+b") as file:
+                        file.seek(offset)
+                        file.write(piece)
+
+            for file_path, part in parts.items():
+                os.replace(part, self._target(file_path))
+            completed = True
+        finally:
+            for sock in connections.values():
+                sock.close()
+            if not completed:
+                for part in parts.values():
+                    try:
+                        os.remove(part)
+                    except FileNotFoundError:
+                        pass
+
+        return downloaded
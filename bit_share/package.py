@@ -1,28 +1,64 @@
 from functools import cached_property
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from fnmatch import fnmatchcase
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 import hashlib
 import pickle
 import json
+import math
 import os
 
+from .constants import PIECE_SIZE
+from .piecestore import digest
+
 if TYPE_CHECKING:
     from .packager import Packager
 
+
+def _glob_match(parts: list[str], pattern: list[str]) -> bool:
+    """
+    Match path segments against pattern segments. '*' and '?' stay within one segment,
+    '**' spans any number of segments, and a pattern that matches a leading directory
+    matches everything below it.
+    """
+
+    if not pattern:
+        return True
+
+    head, rest = pattern[0], pattern[1:]
+    if head == "**":
+        return any(_glob_match(parts[start:], rest) for start in range(len(parts) + 1))
+
+    return bool(parts) and fnmatchcase(parts[0], head) and _glob_match(parts[1:], rest)
+
 class Package:
     name: str
     filelist: list[tuple[str, int]]
+    pieces: list[str]
 
-    def __init__(self, name: str, filelist: list[tuple[str, int]]):
+    def __init__(self, name: str, filelist: list[tuple[str, int]], pieces: list[str] | None = None):
         self.name = name
         self.filelist = filelist
+        self.pieces = pieces if pieces is not None else []
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # The offset indexes are derived from filelist and rebuilt on demand, so keep them out of packets
+        state.pop("offsets", None)
+        state.pop("piece_offsets", None)
+        return state
 
     @classmethod
     def from_packager(cls, packager: 'Packager') -> "Package":
-        return cls(
+        package = cls(
             name=packager.name,
             filelist=sorted([(path.as_posix(), size) for path, size in packager.filelist], key=lambda x: x[0])
         )
+        package.pieces = package.digest_pieces(packager.source.parent)
+        return package
     
     @classmethod
     def from_file(cls, path: str | os.PathLike[str]) -> "Package":
@@ -34,24 +70,214 @@ class Package:
             data = json.load(file)
             ret = cls(
                 name=data["name"],
-                filelist=data["filelist"]
+                filelist=data["filelist"],
+                pieces=data.get("pieces", [])
             )
 
             if ret.hash != data["hash"]:
                 raise ValueError("Hash mismatch: package file may be corrupted")
 
+            if ret.pieces and len(ret.pieces) != ret.piece_count():
+                raise ValueError("Piece count mismatch: package file may be corrupted or created by an older version")
+
             return ret
     
     @cached_property
     def hash(self) -> str:
         content = f"{self.name}:{''.join(f'{path}:{size}' for path, size in self.filelist)}"
+        if self.pieces:
+            # Packages created before piece digests existed keep their original hash
+            content += f":{''.join(self.pieces)}"
         return hashlib.sha256(content.encode()).hexdigest()
+
+    @cached_property
+    def offsets(self) -> array[int]:
+        """
+        Prefix sums of file sizes, built once per package.
+        Returns:
+            array: ``offsets[i]`` is the byte offset of file ``i`` in the package stream,
+                   and ``offsets[-1]`` is the total package size.
+        """
+
+        offsets = array("Q", [0])
+        total = 0
+        for _, size in self.filelist:
+            total += size
+            offsets.append(total)
+        return offsets
+
+    @cached_property
+    def piece_offsets(self) -> array[int]:
+        """
+        Prefix sums of per-file piece counts, built once per package.
+        Pieces are aligned to files: each file is split into PIECE_SIZE pieces starting at
+        its own offset 0, so a change to one file never shifts the pieces of another.
+        Returns:
+            array: ``piece_offsets[i]`` is the index of the first piece of file ``i``,
+                   and ``piece_offsets[-1]`` is the number of pieces in the package.
+        """
+
+        piece_offsets = array("Q", [0])
+        total = 0
+        for _, size in self.filelist:
+            total += math.ceil(size / PIECE_SIZE)
+            piece_offsets.append(total)
+        return piece_offsets
+
+    def size(self) -> int:
+        """
+        Returns:
+            int: The total size in bytes of all files in the package
+        """
+
+        return self.offsets[-1]
+
+    def piece_count(self) -> int:
+        """
+        Returns:
+            int: Number of pieces in the package
+        """
+
+        return self.piece_offsets[-1]
+
+    def segments(self, offset: int, length: int) -> list[tuple[str, int, int]]:
+        """
+        Resolve a byte range of the package stream to the files it covers.
+        Args:
+            offset: Start of the range in the package stream.
+            length: Number of bytes in the range. Clamped to the end of the package.
+        Returns:
+            list: A list of (file_path, file_offset, length) tuples in stream order.
+                  Empty files are skipped since they hold no bytes.
+        """
+
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+
+        offsets = self.offsets
+        end = min(offset + length, offsets[-1])
+        index = bisect_right(offsets, offset) - 1
+
+        segments: list[tuple[str, int, int]] = []
+        while offset < end:
+            path, size = self.filelist[index]
+            file_offset = offset - offsets[index]
+            chunk = min(size - file_offset, end - offset)
+            if chunk > 0:
+                segments.append((path, file_offset, chunk))
+                offset += chunk
+            index += 1
+
+        return segments
+
+    def piece_segments(self, index: int) -> list[tuple[str, int, int]]:
+        """
+        Resolve a piece to the byte range of the file it belongs to.
+        Args:
+            index: Index of the piece in the package.
+        Returns:
+            list: A single (file_path, file_offset, length) tuple, since pieces never span files.
+        """
+
+        if not 0 <= index < self.piece_count():
+            raise IndexError(f"piece index {index} out of range")
+
+        piece_offsets = self.piece_offsets
+        # bisect_right skips empty files, which share their start index with the next file
+        file_index = bisect_right(piece_offsets, index) - 1
+        path, size = self.filelist[file_index]
+        offset = (index - piece_offsets[file_index]) * PIECE_SIZE
+        return [(path, offset, min(PIECE_SIZE, size - offset))]
+
+    def select(self, include: Iterable[str] = (), exclude: Iterable[str] = ()) -> list[str]:
+        """
+        Select package files with glob patterns, in the style of gitignore.
+        Patterns are matched relative to the package root directory (naming the root
+        directory as well is accepted), one path segment at a time: '*' does not cross
+        '/', while '**' matches any number of directories. A pattern without '/' matches
+        a file or directory name at any depth, unless it starts with '/'. A pattern that matches a directory selects
+        everything below it, so 'models' selects every file in any 'models' directory.
+        Args:
+            include: Patterns of files to keep. If empty, every file is kept.
+            exclude: Patterns of files to drop, applied after include.
+        Returns:
+            list: Paths of the selected files in package order.
+        """
+
+        def split(pattern: str) -> list[str]:
+            anchored = pattern.startswith("/")
+            parts = pattern.strip("/").split("/")
+            return ["**", *parts] if len(parts) == 1 and not anchored else parts
+
+        include_parts = [split(pattern) for pattern in include]
+        exclude_parts = [split(pattern) for pattern in exclude]
+
+        # Directory packages keep their root directory as the first segment of every path
+        split_paths = [path.split("/") for path, _ in self.filelist]
+        roots = {parts[0] for parts in split_paths if len(parts) > 1}
+        has_root = len(roots) == 1 and all(len(parts) > 1 for parts in split_paths)
+
+        def matches(parts: list[str], patterns: list[list[str]]) -> bool:
+            candidates = [parts[1:], parts] if has_root else [parts]
+            return any(_glob_match(candidate, pattern) for pattern in patterns for candidate in candidates)
+
+        return [
+            path for (path, _), parts in zip(self.filelist, split_paths)
+            if (not include_parts or matches(parts, include_parts)) and not matches(parts, exclude_parts)
+        ]
+
+    def pieces_for(self, paths: Iterable[str]) -> list[int]:
+        """
+        Pieces covering the given files. Pieces are aligned to files, so no bytes of other files are included.
+        Raises:
+            ValueError: If a path is not a file of the package.
+        Returns:
+            list: Sorted piece indices.
+        """
+
+        index_of = {path: index for index, (path, _) in enumerate(self.filelist)}
+        piece_offsets = self.piece_offsets
+
+        pieces: set[int] = set()
+        for path in paths:
+            index = index_of.get(path)
+            if index is None:
+                raise ValueError(f"file '{path}' is not part of package '{self.name}'")
+            pieces.update(range(piece_offsets[index], piece_offsets[index + 1]))
+
+        return sorted(pieces)
+
+    def read_piece(self, root: str | os.PathLike[str], index: int) -> bytes:
+        """
+        Read a piece from a local copy of the package.
+        Args:
+            root: Directory the package file paths are relative to.
+            index: Index of the piece in the package.
+        Returns:
+            bytes: Content of the piece.
+        """
+
+        buffer = bytearray()
+        for path, offset, length in self.piece_segments(index):
+            with open(os.path.join(root, path), "rb") as file:
+                file.seek(offset)
+                buffer += file.read(length)
+        return bytes(buffer)
+
+    def digest_pieces(self, root: str | os.PathLike[str]) -> list[str]:
+        """
+        Returns:
+            list: Content digest of every piece, read from a local copy of the package at root.
+        """
+
+        return [digest(self.read_piece(root, index)) for index in range(self.piece_count())]
     
     def save(self, path: str | os.PathLike[str]) -> None:
         with open(path, "w") as file:
             json.dump({
                 "name": self.name,
                 "filelist": self.filelist,
+                "pieces": self.pieces,
                 "hash": self.hash
             }, file)
 
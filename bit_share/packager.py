@@ -1,9 +1,7 @@
 from functools import cached_property
 from pathlib import Path
-import math
 import os
 
-from .constants import PIECE_SIZE
 from .package import Package
 
 
@@ -60,12 +58,18 @@ class Packager:
         """
 
         if self.is_file():
-            return [(self.source, self.source.stat().st_size)]
+            return [(Path(self.source.name), self.source.stat().st_size)]
 
         return [
             (file.relative_to(self.source.parent), file.stat().st_size) for file in self.source.rglob("**/*") if file.is_file()
         ]
     
+    @cached_property
+    def _layout(self) -> Package:
+        """Package without piece digests, so sizes and piece counts come from the package offset index."""
+
+        return Package(self.name, [(path.as_posix(), size) for path, size in self.filelist])
+
     def size(self) -> int:
         """
         Calculate the total size of all files in the source directory.
@@ -73,7 +77,7 @@ class Packager:
             int: The total size in bytes of all files contained in the source directory.
         """
 
-        return sum(size for _, size in self.filelist)
+        return self._layout.size()
     
     def piece_count(self) -> int:
         """
@@ -81,7 +85,7 @@ class Packager:
             int: Number of pieces in the package
         """
 
-        return math.ceil(self.size() / PIECE_SIZE)
+        return self._layout.piece_count()
     
     def package(self):
 
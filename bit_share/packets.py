@@ -6,7 +6,7 @@ from .types import PacketType
 from .package import Package
 from .seed import Seed
 
-__all__ = ["SeedPacket", "DiscoveryRequestPacket", "DiscoveryResponsePacket"]
+__all__ = ["SeedPacket", "DiscoveryRequestPacket", "DiscoveryResponsePacket", "PieceRequestPacket", "PieceResponsePacket"]
 
 
 def resolve_packet_subclass(packet_type: PacketType) -> type["Packet"]:
@@ -16,6 +16,10 @@ def resolve_packet_subclass(packet_type: PacketType) -> type["Packet"]:
         return DiscoveryRequestPacket
     if packet_type == PacketType.DISCOVERY_RESPONSE:
         return DiscoveryResponsePacket
+    if packet_type == PacketType.PIECE_REQUEST:
+        return PieceRequestPacket
+    if packet_type == PacketType.PIECE_RESPONSE:
+        return PieceResponsePacket
     return Packet
 
 
@@ -80,4 +84,30 @@ class DiscoveryResponsePacket(Packet):
     
     @property
     def hash(self) -> str:
-        return self.data.decode()
\ No newline at end of file
+        return self.data.decode()
+
+class PieceRequestPacket(Packet):
+    def __init__(self, data: bytes):
+        super().__init__(PacketType.PIECE_REQUEST, data)
+
+    @classmethod
+    def from_digest(cls, digest: str) -> "PieceRequestPacket":
+        return cls(digest.encode())
+
+    @property
+    def digest(self) -> str:
+        return self.data.decode()
+
+class PieceResponsePacket(Packet):
+    """Piece content, or no data when the peer does not have the piece."""
+
+    def __init__(self, data: bytes):
+        super().__init__(PacketType.PIECE_RESPONSE, data)
+
+    @classmethod
+    def from_piece(cls, piece: bytes | None) -> "PieceResponsePacket":
+        return cls(piece or b"")
+
+    @property
+    def piece(self) -> bytes | None:
+        return self.data or None
\ No newline at end of file
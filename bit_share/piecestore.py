@@ -0,0 +1,132 @@
+from collections.abc import Iterable
+from pathlib import Path
+import hashlib
+import os
+
+from .constants import PIECE_STORE, PIECE_STORE_LIMIT
+
+
+def digest(data: bytes) -> str:
+    """Content address of a piece."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class PieceStore:
+    """
+    Local content-addressed piece cache shared by every package.
+    Downloaded pieces are kept here so later fetches of any package can reuse them
+    without asking peers. The cache is bounded: once it grows past limit bytes, the
+    least recently used pieces are removed until it is back to half the limit.
+    """
+
+    def __init__(self, root: str | os.PathLike[str] = PIECE_STORE, limit: int = PIECE_STORE_LIMIT):
+        if limit < 0:
+            raise ValueError("limit must not be negative")
+
+        self.root = Path(root)
+        self.limit = limit
+        self._usage: int | None = None
+
+    def path(self, piece_digest: str) -> Path:
+        return self.root / piece_digest[:2] / piece_digest
+
+    def has(self, piece_digest: str) -> bool:
+        return self.path(piece_digest).is_file()
+
+    def get(self, piece_digest: str) -> bytes | None:
+        path = self.path(piece_digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            # Reads count as use, so pruning removes the pieces that were needed least recently
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, data: bytes, piece_digest: str | None = None) -> str:
+        """
+        Store a piece under its digest, pruning the store if it grows past its limit.
+        Args:
+            data: Piece content.
+            piece_digest: Expected digest. If given, the content is verified against it.
+        Returns:
+            str: Digest the piece was stored under.
+        """
+
+        actual = digest(data)
+        if piece_digest is not None and actual != piece_digest:
+            raise ValueError(f"Digest mismatch: expected {piece_digest}, got {actual}")
+
+        path = self.path(actual)
+        if path.is_file():
+            return actual
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+        self._usage = self.usage() if self._usage is None else self._usage + len(data)
+        if self._usage > self.limit:
+            self._usage = self.prune(self.limit // 2)
+
+        return actual
+
+    def _pieces(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.root.is_dir():
+            return []
+
+        pieces: list[tuple[Path, os.stat_result]] = []
+        for path in self.root.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                pieces.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return pieces
+
+    def usage(self) -> int:
+        """
+        Returns:
+            int: Total size in bytes of the pieces in the store.
+        """
+
+        return sum(stat.st_size for _, stat in self._pieces())
+
+    def prune(self, limit: int | None = None) -> int:
+        """
+        Remove least recently used pieces until the store holds at most limit bytes.
+        Args:
+            limit: Size to prune down to. Defaults to the store limit.
+        Returns:
+            int: Total size in bytes of the pieces left in the store.
+        """
+
+        limit = self.limit if limit is None else limit
+        pieces = sorted(self._pieces(), key=lambda piece: piece[1].st_mtime)
+        usage = sum(stat.st_size for _, stat in pieces)
+
+        for path, stat in pieces:
+            if usage <= limit:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            usage -= stat.st_size
+
+        self._usage = usage
+        return usage
+
+    def missing(self, digests: Iterable[str]) -> list[str]:
+        """
+        Returns:
+            list: Digests not present in the store, without duplicates, in first-seen order.
+        """
+
+        return [piece_digest for piece_digest in dict.fromkeys(digests) if not self.has(piece_digest)]
@@ -1,13 +1,57 @@
+from collections.abc import MutableMapping
+from multiprocessing.managers import SyncManager
+from typing import Any
+
+from .package import Package
 from .seed import Seed
 
 
 class SeedBox:
-	def __init__(self):
-		self._by_hash: dict[str, Seed] = {}
+	def __init__(
+		self,
+		by_hash: MutableMapping[str, Seed] | None = None,
+		by_piece: MutableMapping[str, tuple[str, int, str]] | None = None
+	):
+		self._by_hash: MutableMapping[str, Seed] = {} if by_hash is None else by_hash
+		# piece digest -> (package hash, piece index, seed path), shared by every seeded package
+		self._by_piece: MutableMapping[str, tuple[str, int, str]] = {} if by_piece is None else by_piece
+		# Packages are immutable for a given hash, so each process keeps its own copy
+		# instead of unpickling one from a shared index on every piece request
+		self._packages: dict[str, Package] = {}
+
+	def __getstate__(self) -> dict[str, Any]:
+		state = self.__dict__.copy()
+		state["_packages"] = {}
+		return state
+
+	@classmethod
+	def shared(cls, manager: SyncManager) -> "SeedBox":
+		"""Seed box backed by manager dicts, readable from worker processes."""
+		return cls(manager.dict(), manager.dict())
 
 	def add(self, seed: Seed) -> None:
 		package_hash = seed.package.hash
 		self._by_hash[package_hash] = seed
+		self._packages[package_hash] = seed.package
+		# A single update keeps this to one round trip when the index is a manager dict
+		self._by_piece.update({
+			piece_digest: (package_hash, index, seed.path) for index, piece_digest in enumerate(seed.package.pieces)
+		})
 
 	def lookup(self, package_hash: str) -> Seed | None:
 		return self._by_hash.get(package_hash)
+
+	def lookup_piece(self, piece_digest: str) -> tuple[Seed, int] | None:
+		location = self._by_piece.get(piece_digest)
+		if location is None:
+			return None
+
+		package_hash, index, path = location
+		package = self._packages.get(package_hash)
+		if package is None:
+			seed = self.lookup(package_hash)
+			if seed is None:
+				return None
+			package = self._packages[package_hash] = seed.package
+
+		return Seed(package, path), index
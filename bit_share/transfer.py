@@ -2,7 +2,6 @@ import socket
 import struct
 import threading
 import ipaddress
-import psutil
 from typing import Optional, Generator, cast
 from collections.abc import Iterable
 
@@ -11,6 +10,8 @@ from .packets import Packet
 
 
 def broadcast_destinations(port: int) -> list[tuple[str, int]]:
+    import psutil
+
     destinations: set[tuple[str, int]] = set()
 
     for addresses in psutil.net_if_addrs().values():
@@ -103,7 +104,8 @@ def send_packet(
                 continue
         return total_sent
     elif sock_type == socket.SOCK_STREAM:
-        return sock.send(frame)
+        sock.sendall(frame)
+        return len(frame)
     else:
         raise ValueError(f"Unsupported socket type: {sock_type}")
 
@@ -127,14 +129,15 @@ def recv_packet(
             raise ConnectionError("Connection closed or incomplete data")
         size = struct.unpack('!I', size_data)[0]
         
-        payload = b''
+        buffer = bytearray()
         remaining = size
         while remaining > 0:
             chunk = sock.recv(remaining)
             if not chunk:
                 raise ConnectionError("Connection closed before receiving all data")
-            payload += chunk
+            buffer += chunk
             remaining -= len(chunk)
+        payload = bytes(buffer)
         
         addr = None
     else:
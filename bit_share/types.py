@@ -5,4 +5,6 @@ from enum import Enum
 class PacketType(Enum):
     SEED = "SEED"
     DISCOVERY_REQUEST = "DREQ"
-    DISCOVERY_RESPONSE = "DRES"
\ No newline at end of file
+    DISCOVERY_RESPONSE = "DRES"
+    PIECE_REQUEST = "PREQ"
+    PIECE_RESPONSE = "PRES"
\ No newline at end of file
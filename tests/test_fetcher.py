@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+import bit_share.package
+from bit_share.fetcher import Fetcher
+from bit_share.package import Package
+from bit_share.packager import Packager
+from bit_share.piecestore import PieceStore
+
+
+@pytest.fixture(autouse=True)
+def small_pieces(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(bit_share.package, "PIECE_SIZE", 16)
+
+
+def _package(root: Path, files: dict[str, bytes]) -> Package:
+    for name, content in files.items():
+        path = root / "data" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return Packager(root / "data").package()
+
+
+def test_fetch_reuses_local_source_in_place(tmp_path: Path):
+    files = {"a.bin": b"a" * 40, "sub/b.bin": b"b" * 20}
+    v1 = _package(tmp_path / "v1", files)
+    files["a.bin"] += b"grown"
+    files["c.bin"] = b"new file"
+    v2 = _package(tmp_path / "v2", files)
+
+    # Only v2's changed and new pieces are missing once v1's output is a source
+    fetcher = Fetcher(v2, tmp_path / "v1", [], PieceStore(tmp_path / "store"), sources=[(v1, tmp_path / "v1")])
+    assert len(fetcher.missing()) == 2
+
+    # Seed the store with exactly those pieces, so the fetch needs no peer
+    for index in range(v2.piece_count()):
+        if v2.pieces[index] in fetcher.missing():
+            fetcher.store.put(v2.read_piece(tmp_path / "v2", index))
+
+    assert fetcher.fetch() == 0
+    for name, content in files.items():
+        assert (tmp_path / "v1" / "data" / name).read_bytes() == content
+    assert not list((tmp_path / "v1").rglob("*.part"))
+
+
+def test_fetch_without_peers_fails_cleanly(tmp_path: Path):
+    package = _package(tmp_path / "src", {"a.bin": b"a" * 40})
+    fetcher = Fetcher(package, tmp_path / "out", [], PieceStore(tmp_path / "store"))
+
+    with pytest.raises(ConnectionError):
+        fetcher.fetch()
+    assert not list((tmp_path / "out").rglob("*.part"))
+
+
+def test_rejects_unsafe_paths(tmp_path: Path):
+    for path in ("../evil", "/etc/evil", "data/../../evil"):
+        with pytest.raises(ValueError, match="unsafe file path"):
+            Fetcher(Package("x", [(path, 1)], ["0" * 64]), tmp_path, [])
+
+
+def test_rejects_piece_count_mismatch(tmp_path: Path):
+    with pytest.raises(ValueError, match="piece digests"):
+        Fetcher(Package("x", [("data/a.bin", 40)], ["0" * 64]), tmp_path, [])
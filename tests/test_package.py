@@ -0,0 +1,201 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import bit_share.package
+from bit_share.package import Package
+from bit_share.packager import Packager
+
+# Small pieces keep the fixtures tiny while still producing multi-piece files
+PIECE_SIZE = 16
+
+
+@pytest.fixture(autouse=True)
+def small_pieces(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(bit_share.package, "PIECE_SIZE", PIECE_SIZE)
+
+
+def _write_tree(root: Path, files: dict[str, bytes]) -> None:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def _file_digests(package: Package) -> dict[str, list[str]]:
+    piece_offsets = package.piece_offsets
+    return {
+        path: package.pieces[piece_offsets[index]:piece_offsets[index + 1]]
+        for index, (path, _) in enumerate(package.filelist)
+    }
+
+
+def test_unchanged_files_keep_digests_when_neighbour_changes(tmp_path: Path):
+    files = {f"data/f{index:02d}.bin": bytes([index]) * 50 for index in range(5)}
+
+    _write_tree(tmp_path / "v1", files)
+    v1 = Packager(tmp_path / "v1" / "data", name="data").package()
+
+    # Grow an early file by a few bytes and add a file that sorts before everything else
+    files["data/f01.bin"] += b"grown"
+    files["data/a.bin"] = b"first"
+    _write_tree(tmp_path / "v2", files)
+    v2 = Packager(tmp_path / "v2" / "data", name="data").package()
+
+    before, after = _file_digests(v1), _file_digests(v2)
+    for path in ("data/f00.bin", "data/f02.bin", "data/f03.bin", "data/f04.bin"):
+        assert before[path] == after[path]
+    assert before["data/f01.bin"] != after["data/f01.bin"]
+    assert v1.hash != v2.hash
+
+
+def test_piece_digests_match_content(tmp_path: Path):
+    _write_tree(tmp_path, {"data/a.bin": b"a" * 20, "data/empty": b"", "data/b.bin": b"b" * 16})
+    package = Packager(tmp_path / "data").package()
+
+    assert package.piece_count() == 3
+    for index in range(package.piece_count()):
+        piece = package.read_piece(tmp_path, index)
+        assert bit_share.package.digest(piece) == package.pieces[index]
+
+
+def test_from_file_rejects_piece_count_mismatch(tmp_path: Path):
+    package = Package("data", [("data/a.bin", 40)], ["0" * 64])
+    path = tmp_path / "data.json"
+    package.save(path)
+    # The hash is self-consistent, only the piece list is too short
+    assert json.loads(path.read_text())["hash"] == package.hash
+
+    with pytest.raises(ValueError, match="Piece count mismatch"):
+        Package.from_file(path)
+
+
+def test_from_file_accepts_packages_without_digests(tmp_path: Path):
+    package = Package("data", [("data/a.bin", 40)])
+    path = tmp_path / "data.json"
+    package.save(path)
+
+    assert Package.from_file(path).hash == package.hash
+
+
+DATASET = Package("ds", [
+    ("ds/a.bin", 40),
+    ("ds/empty.bin", 0),
+    ("ds/models/m.pt", 20),
+    ("ds/readme.txt", 5),
+    ("ds/sub/b.bin", 16),
+    ("ds/sub/deep/c.bin", 1),
+    ("ds/sub/models/n.pt", 3),
+])
+
+
+@pytest.mark.parametrize(("include", "exclude", "expected"), [
+    ([], [], [path for path, _ in DATASET.filelist]),
+    (["*.bin"], [], ["ds/a.bin", "ds/empty.bin", "ds/sub/b.bin", "ds/sub/deep/c.bin"]),
+    (["/*.bin"], [], ["ds/a.bin", "ds/empty.bin"]),
+    (["sub/*.bin"], [], ["ds/sub/b.bin"]),
+    (["ds/sub/*.bin"], [], ["ds/sub/b.bin"]),
+    (["sub/**/*.bin"], [], ["ds/sub/b.bin", "ds/sub/deep/c.bin"]),
+    (["models"], [], ["ds/models/m.pt", "ds/sub/models/n.pt"]),
+    (["models/"], [], ["ds/models/m.pt", "ds/sub/models/n.pt"]),
+    (["sub/models"], [], ["ds/sub/models/n.pt"]),
+    (["sub"], ["deep", "*.pt"], ["ds/sub/b.bin"]),
+    ([], ["*.bin", "*.pt"], ["ds/readme.txt"]),
+    (["nothing*"], [], []),
+])
+def test_select(include: list[str], exclude: list[str], expected: list[str]):
+    assert DATASET.select(include, exclude) == expected
+
+
+def test_select_single_file_package():
+    package = Package("file", [("file.bin", 10)])
+
+    assert package.select(["*.bin"]) == ["file.bin"]
+    assert package.select(["file.bin"]) == ["file.bin"]
+    assert package.select(["*.txt"]) == []
+
+
+def test_pieces_for_covers_only_selected_files():
+    # Pieces of 16 bytes: a.bin -> 0..2, empty.bin -> none, m.pt -> 3..4, readme -> 5,
+    # b.bin -> 6, c.bin -> 7, n.pt -> 8
+    assert DATASET.pieces_for(["ds/a.bin"]) == [0, 1, 2]
+    assert DATASET.pieces_for(["ds/empty.bin"]) == []
+    assert DATASET.pieces_for(["ds/sub/models/n.pt", "ds/models/m.pt"]) == [3, 4, 8]
+    assert DATASET.pieces_for(path for path, _ in DATASET.filelist) == list(range(DATASET.piece_count()))
+
+
+def test_pieces_for_rejects_unknown_file():
+    with pytest.raises(ValueError, match="ds/missing.bin"):
+        DATASET.pieces_for(["ds/missing.bin"])
+
+
+LAYOUT = Package("data", [("data/a", 10), ("data/empty", 0), ("data/b", 40), ("data/c", 16), ("data/tail", 3)])
+
+
+def test_offsets():
+    assert list(LAYOUT.offsets) == [0, 10, 10, 50, 66, 69]
+    assert LAYOUT.size() == 69
+
+
+def test_piece_offsets():
+    # 16-byte pieces per file: a -> 1, empty -> 0, b -> 3, c -> 1, tail -> 1
+    assert list(LAYOUT.piece_offsets) == [0, 1, 1, 4, 5, 6]
+    assert LAYOUT.piece_count() == 6
+
+
+@pytest.mark.parametrize(("offset", "length", "expected"), [
+    (0, 10, [("data/a", 0, 10)]),
+    (5, 10, [("data/a", 5, 5), ("data/b", 0, 5)]),
+    (10, 1, [("data/b", 0, 1)]),
+    (45, 25, [("data/b", 35, 5), ("data/c", 0, 16), ("data/tail", 0, 3)]),
+    (60, 1000, [("data/c", 10, 6), ("data/tail", 0, 3)]),
+    (69, 10, []),
+    (3, 0, []),
+])
+def test_segments(offset: int, length: int, expected: list[tuple[str, int, int]]):
+    assert LAYOUT.segments(offset, length) == expected
+
+
+def test_segments_rejects_negative_range():
+    with pytest.raises(ValueError):
+        LAYOUT.segments(-1, 5)
+    with pytest.raises(ValueError):
+        LAYOUT.segments(0, -5)
+
+
+@pytest.mark.parametrize(("index", "expected"), [
+    (0, ("data/a", 0, 10)),
+    (1, ("data/b", 0, 16)),
+    (2, ("data/b", 16, 16)),
+    (3, ("data/b", 32, 8)),
+    (4, ("data/c", 0, 16)),
+    (5, ("data/tail", 0, 3)),
+])
+def test_piece_segments(index: int, expected: tuple[str, int, int]):
+    assert LAYOUT.piece_segments(index) == [expected]
+
+
+@pytest.mark.parametrize("index", [-1, 6])
+def test_piece_segments_out_of_range(index: int):
+    with pytest.raises(IndexError):
+        LAYOUT.piece_segments(index)
+
+
+def test_empty_package():
+    package = Package("empty", [("empty/a", 0)])
+
+    assert package.size() == 0
+    assert package.piece_count() == 0
+    assert package.segments(0, 10) == []
+
+
+def test_offset_indexes_are_not_pickled():
+    package = Package("data", list(LAYOUT.filelist))
+    package.offsets
+    package.piece_offsets
+
+    decoded = Package.from_binary(package.encode())
+    assert "offsets" not in decoded.__dict__
+    assert "piece_offsets" not in decoded.__dict__
+    assert decoded.piece_segments(3) == package.piece_segments(3)
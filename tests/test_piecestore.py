@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from bit_share.piecestore import PieceStore, digest
+
+
+def test_round_trip(tmp_path: Path):
+    store = PieceStore(tmp_path)
+    piece_digest = store.put(b"content")
+
+    assert piece_digest == digest(b"content")
+    assert store.has(piece_digest)
+    assert store.get(piece_digest) == b"content"
+    assert store.usage() == len(b"content")
+
+
+def test_get_unknown_digest(tmp_path: Path):
+    store = PieceStore(tmp_path)
+
+    assert store.get(digest(b"absent")) is None
+    assert not store.has(digest(b"absent"))
+
+
+def test_put_verifies_expected_digest(tmp_path: Path):
+    store = PieceStore(tmp_path)
+
+    with pytest.raises(ValueError, match="Digest mismatch"):
+        store.put(b"content", digest(b"other"))
+    assert store.usage() == 0
+
+
+def test_put_is_idempotent(tmp_path: Path):
+    store = PieceStore(tmp_path)
+    store.put(b"content")
+    store.put(b"content")
+
+    assert store.usage() == len(b"content")
+
+
+def test_missing_deduplicates_in_order(tmp_path: Path):
+    store = PieceStore(tmp_path)
+    present = store.put(b"present")
+    first, second = digest(b"first"), digest(b"second")
+
+    assert store.missing([first, present, second, first]) == [first, second]
+
+
+def test_prune_removes_least_recently_used(tmp_path: Path):
+    store = PieceStore(tmp_path)
+    old = store.put(b"a" * 10)
+    used = store.put(b"b" * 10)
+    new = store.put(b"c" * 10)
+
+    os.utime(store.path(old), (1000, 1000))
+    os.utime(store.path(used), (2000, 2000))
+    os.utime(store.path(new), (3000, 3000))
+    # Reading a piece marks it as recently used
+    store.get(used)
+
+    assert store.prune(20) == 20
+    assert not store.has(old)
+    assert store.has(used)
+    assert store.has(new)
+
+
+def test_put_prunes_past_limit(tmp_path: Path):
+    store = PieceStore(tmp_path, limit=25)
+    for index in range(3):
+        store.put(bytes([index]) * 10)
+        os.utime(store.path(digest(bytes([index]) * 10)), (1000 + index, 1000 + index))
+
+    # 30 bytes exceeds the limit, so the store is pruned down to half of it
+    assert store.usage() <= 12
+    assert store.has(digest(bytes([2]) * 10))
+
+
+def test_zero_limit_keeps_nothing(tmp_path: Path):
+    store = PieceStore(tmp_path, limit=0)
+    piece_digest = store.put(b"content")
+
+    assert not store.has(piece_digest)